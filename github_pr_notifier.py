@@ -4,6 +4,7 @@
 # dependencies = [
 #     "requests>=2.32.5",
 #     "blink1>=0.4.0",
+#     "orjson>=3.10",
 # ]
 # ///
 """
@@ -15,13 +16,30 @@ blink(1) device notifications for different event types.
 
 import os
 import time
-import json
 import logging
+import queue
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 import argparse
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlencode, urlparse
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    print("requests library not found. Install with: pip install requests")
+    exit(1)
+
+try:
+    import orjson
+except ImportError:
+    print("orjson library not found. Install with: pip install orjson")
+    exit(1)
 
 try:
     from blink1.blink1 import Blink1, Blink1ConnectionFailed
@@ -41,6 +59,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# GitHub API endpoint
+API_URL = 'https://api.github.com'
+
+# Environment for the gh CLI token lookup, built once with the pager disabled
+GH_ENV = {**os.environ, 'GH_PAGER': ''}
+
+# Maximum number of PRs fetched concurrently; also the size of the HTTP connection pool
+MAX_WORKERS = 10
+
+# Upper bound for the poll interval when backing off on idle polls, in seconds
+MAX_POLL_INTERVAL = 600
+
+# Page size for REST list requests
+PER_PAGE = 100
+
+# Maximum number of processed event ids remembered for deduplication
+MAX_PROCESSED_EVENTS = 10000
+
+# Processed events and last check time are persisted here across restarts
+STATE_FILE = os.path.expanduser('~/.cache/blink1-pr-notify/state.json')
+
+# How far back to look for activity on startup, also the most a resumed run replays
+LOOKBACK = timedelta(hours=1)
+
+# Each poll re-reads this much activity before the last check, to catch events
+# and notifications GitHub records late; already processed events are deduplicated
+POLL_OVERLAP = timedelta(minutes=5)
+
+# Processed event ids last seen this long before the last check are dropped from state
+STATE_TTL = timedelta(hours=2)
+
 
 @dataclass
 class PREvent:
@@ -49,29 +98,74 @@ class PREvent:
     event_type: str  # 'comment', 'approved', 'changes_requested', 'dismissed'
     author: str
     created_at: str
-    body: Optional[str] = None
+    body: Optional[str] = None  # full body as returned by GitHub; truncated when logged
     
 
 class GitHubPRMonitor:
     """Monitors GitHub PRs and triggers blink(1) notifications"""
     
-    def __init__(self, username: str, poll_interval: int = 60, test_mode: bool = False):
+    # Flash color, log description and blink(1) pattern for each event type
+    _PATTERNS = {
+        'comment': ('BLUE', 'comment', '3, #0000FF,0.3,0, #000000,0.3,0'),
+        'approved': ('GREEN', 'approval', '5, #00FF00,0.5,0, #000000,0.2,0'),
+        'changes_requested': ('RED', 'change request', '2, #FF0000,1.0,0, #000000,0.5,0'),
+        'commented': ('YELLOW', 'review comment', '3, #FFFF00,0.3,0, #000000,0.3,0'),
+    }
+    
+    def __init__(self, username: Optional[str], poll_interval: int = 60, test_mode: bool = False):
         self.username = username
         self.poll_interval = poll_interval
         self.test_mode = test_mode
         
-        # Track processed events to avoid duplicates
-        self.processed_events: Set[str] = set()
+        # Track processed events by GitHub node id (globally unique) to avoid duplicates,
+        # oldest first, bounded as an LRU
+        self.processed_events: OrderedDict[str, float] = OrderedDict()
+        self._events_lock = threading.Lock()
+        
+        # ETags of per-PR API responses, keyed by path and query, for conditional requests
+        self._etags: Dict[str, str] = {}
+        
+        # Page holding the newest reviews of each PR, keyed by reviews path
+        self._review_pages: Dict[str, int] = {}
+        
+        # Last-Modified of the notifications feed and GitHub's suggested poll interval
+        self._notifications_modified: Optional[str] = None
+        self._server_poll_interval = 0
+        
+        # Consecutive polls without new events, used to back off the poll interval
+        self._idle_ticks = 0
+        
+        # Open PRs change slowly, so the search result is reused for a few minutes
+        self._pr_cache: Optional[Tuple[float, List[Dict]]] = None
+        self._pr_cache_ttl = 300
+        
+        # Notified PRs that a fresh search showed aren't the user's (e.g. ones they reviewed)
+        self._foreign_prs: Set[Tuple[str, int]] = set()
         
         # Last check time - look back 1 hour to catch recent activity
-        self.last_check = datetime.now(timezone.utc) - timedelta(hours=1)
+        self.last_check = datetime.now(timezone.utc) - LOOKBACK
+        
+        # Resume from the previous run, if any, to avoid re-flashing old events
+        self._load_state()
         
         # Initialize blink(1) device
         self.blink1 = None
         self._init_blink1()
         
-        # Verify gh CLI is available
-        self._check_gh_cli()
+        # Flash events on a background thread so the device doesn't hold up polling
+        # None in the queue tells the worker to stop
+        self._flash_queue: queue.Queue[Optional[PREvent]] = queue.Queue()
+        self._flash_thread = threading.Thread(target=self._flash_worker, daemon=True)
+        self._flash_thread.start()
+        
+        # Reuse one HTTP session so API calls share keep-alive connections
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+        self._init_http()
+        
+        if not self.username:
+            self.username = self._get_authenticated_user()
+            logger.info(f"Using GitHub username of the authenticated user: {self.username}")
     
     def _init_blink1(self):
         """Initialize blink(1) device connection"""
@@ -82,39 +176,107 @@ class GitHubPRMonitor:
             logger.error(f"Failed to connect to blink(1) device: {e}")
             self.blink1 = None
     
-    def _check_gh_cli(self):
-        """Verify gh CLI is installed and authenticated"""
+    def _load_state(self):
+        """Restore processed events and last check time from the state file"""
+        try:
+            with open(STATE_FILE, 'rb') as f:
+                state = orjson.loads(f.read())
+            # Don't replay more than the usual lookback after a long time offline
+            last_check = max(datetime.fromisoformat(state['last_check']),
+                             datetime.now(timezone.utc) - LOOKBACK)
+            processed_events = sorted(
+                ((str(event_id), float(seen_at)) for event_id, seen_at in state['processed_events'].items()),
+                key=lambda item: item[1]
+            )
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable state file {STATE_FILE}: {e}")
+            return
+        
+        self.last_check = last_check
+        cutoff = (last_check - STATE_TTL).timestamp()
+        for event_id, seen_at in processed_events:
+            if seen_at >= cutoff:
+                self.processed_events[event_id] = seen_at
+        logger.info(f"Resumed from {STATE_FILE}, last check at {last_check.isoformat()}")
+    
+    def _save_state(self):
+        """Atomically write processed events and last check time to the state file"""
+        cutoff = (self.last_check - STATE_TTL).timestamp()
+        with self._events_lock:
+            # Entries are ordered by when they were last seen, so expired ones are at the front
+            while self.processed_events and next(iter(self.processed_events.values())) < cutoff:
+                self.processed_events.popitem(last=False)
+            state = {
+                'last_check': self.last_check.isoformat(),
+                'processed_events': dict(self.processed_events)
+            }
+        
+        tmp_path = f"{STATE_FILE}.tmp"
         try:
-            result = subprocess.run(['gh', 'auth', 'status'], 
-                                  capture_output=True, text=True, check=True)
+            os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(state))
+            os.replace(tmp_path, STATE_FILE)
+        except OSError as e:
+            logger.warning(f"Failed to save state to {STATE_FILE}: {e}")
+    
+    def _init_http(self):
+        """Authenticate the HTTP session with the gh CLI token"""
+        # The token is read once; everything else goes over the session
+        try:
+            result = subprocess.run(['gh', 'auth', 'token'], 
+                                  capture_output=True, text=True, check=True, env=GH_ENV)
             logger.info("gh CLI is authenticated and ready")
-        except subprocess.CalledProcessError as e:
+        except subprocess.CalledProcessError:
             logger.error("gh CLI is not authenticated. Run 'gh auth login' first")
             raise Exception("gh CLI authentication required")
         except FileNotFoundError:
             logger.error("gh CLI not found. Please install GitHub CLI")
             raise Exception("gh CLI not installed")
+        
+        self.http.headers.update({
+            'Authorization': f"Bearer {result.stdout.strip()}",
+            'Accept': 'application/vnd.github+json'
+        })
     
+    def _get_authenticated_user(self) -> str:
+        """Get the login of the user the gh CLI token belongs to"""
+        try:
+            response = self.http.get(f"{API_URL}/user", timeout=30)
+            response.raise_for_status()
+            return orjson.loads(response.content)['login']
+        except (requests.RequestException, ValueError, KeyError) as e:
+            logger.error(f"Failed to get GitHub username: {e}")
+            raise Exception("GitHub username required. Set GITHUB_USERNAME env var, use --username, or ensure gh CLI is authenticated")
+    
+    def _graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Run a GraphQL query against the GitHub API"""
+        response = self.http.post(f"{API_URL}/graphql", json={
+            'query': query,
+            'variables': variables or {}
+        }, timeout=30)
+        response.raise_for_status()
+        return orjson.loads(response.content)
     
     def get_user_prs(self) -> List[Dict]:
         """Get all open PRs created by the user"""
-        # Use gh search to find user's open PRs
+        if self._pr_cache and time.monotonic() - self._pr_cache[0] < self._pr_cache_ttl:
+            return self._pr_cache[1]
+        
+        # Use GraphQL search to find user's open PRs, fetching only the fields we need
+        query = (
+            "query($q: String!) { search(query: $q, type: ISSUE, first: 100) { "
+            "nodes { ... on PullRequest { number title url repository { nameWithOwner } } } } }"
+        )
         try:
-            env = os.environ.copy()
-            env['GH_PAGER'] = ''
-            
-            result = subprocess.run([
-                'gh', 'search', 'prs', '--author', self.username, '--state', 'open', 
-                '--limit', '100', '--json', 'number,title,repository,url'
-            ], capture_output=True, text=True, check=True, env=env)
-            data = json.loads(result.stdout) if result.stdout.strip() else []
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+            response = self._graphql(query, {'q': f"author:{self.username} is:pr is:open"})
+            data = response['data']['search']['nodes']
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
             logger.error(f"Failed to get user PRs: {e}")
             return []
         
-        if not data:
-            return []
-        
         prs = []
         for item in data:
             prs.append({
@@ -124,54 +286,150 @@ class GitHubPRMonitor:
                 'url': item['url']
             })
         
+        self._pr_cache = (time.monotonic(), prs)
         return prs
     
+    def _mark_processed(self, event_id: str) -> bool:
+        """Record an event as processed, returning False if it was already seen"""
+        with self._events_lock:
+            if event_id in self.processed_events:
+                self.processed_events[event_id] = time.time()
+                self.processed_events.move_to_end(event_id)
+                return False
+            self.processed_events[event_id] = time.time()
+            while len(self.processed_events) > MAX_PROCESSED_EVENTS:
+                self.processed_events.popitem(last=False)
+            return True
+    
+    def get_notified_prs(self) -> Optional[Set[Tuple[str, int]]]:
+        """Get PRs with notifications since last check, or None if notifications are unavailable"""
+        headers = {}
+        if self._notifications_modified:
+            headers['If-Modified-Since'] = self._notifications_modified
+        
+        try:
+            response = self.http.get(f"{API_URL}/notifications", params={
+                'all': 'true',
+                'participating': 'true',
+                'since': self._last_check_iso,
+                'per_page': PER_PAGE
+            }, headers=headers, timeout=30)
+            if response.status_code != 304:
+                response.raise_for_status()
+                data = orjson.loads(response.content)
+                
+                # Busy windows span several pages; stopping early would drop PRs for good
+                page_response = response
+                while 'next' in page_response.links:
+                    page_response = self.http.get(page_response.links['next']['url'], timeout=30)
+                    page_response.raise_for_status()
+                    data.extend(orjson.loads(page_response.content))
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Failed to get notifications: {e}")
+            return None
+        
+        # GitHub asks clients not to poll notifications more often than this
+        if 'X-Poll-Interval' in response.headers:
+            self._server_poll_interval = int(response.headers['X-Poll-Interval'])
+        if response.status_code == 304:
+            return set()
+        if 'Last-Modified' in response.headers:
+            self._notifications_modified = response.headers['Last-Modified']
+        
+        prs = set()
+        for notification in data:
+            subject = notification['subject']
+            if subject['type'] == 'PullRequest' and subject.get('url'):
+                pr_number = int(subject['url'].rsplit('/', 1)[1])
+                prs.add((notification['repository']['full_name'], pr_number))
+        
+        return prs
+    
+    def _get(self, path: str, params: Optional[Dict] = None) -> Optional[requests.Response]:
+        """GET an API path, returning None if it is unchanged since the last request"""
+        # Conditional requests answered with 304 don't count against the rate limit
+        # since moves forward every poll, so it is left out of the key; an empty or
+        # unchanged result then still matches the previous ETag
+        key_params = sorted((k, v) for k, v in (params or {}).items() if k != 'since')
+        key = f"{path}?{urlencode(key_params)}"
+        
+        headers = {}
+        etag = self._etags.get(key)
+        if etag:
+            headers['If-None-Match'] = etag
+        
+        response = self.http.get(f"{API_URL}{path}", params=params, headers=headers, timeout=30)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        
+        if 'ETag' in response.headers:
+            self._etags[key] = response.headers['ETag']
+        return response
+    
+    def _get_latest_reviews(self, repo: str, pr_number: int) -> Optional[List]:
+        """Get reviews from the newest watched page onward, or None if it is unchanged since the last request"""
+        # Reviews can't be filtered by date and are listed oldest first, so fetching starts
+        # at the page that held the newest reviews last time; older pages were already seen.
+        # Known gap: the list is in creation order, so a pending review started long ago but
+        # submitted now sits on an earlier page and is missed once that page is left behind.
+        path = f"/repos/{repo}/pulls/{pr_number}/reviews"
+        page = self._review_pages.get(path, 1)
+        
+        response = self._get(path, {'per_page': PER_PAGE, 'page': page})
+        if response is None:
+            return None
+        page_reviews = orjson.loads(response.content)
+        reviews = list(page_reviews)
+        
+        # Walk forward through every following page; jumping to the last would skip the ones between
+        while 'next' in response.links:
+            page = int(parse_qs(urlparse(response.links['next']['url']).query)['page'][0])
+            response = self._get(path, {'per_page': PER_PAGE, 'page': page})
+            if response is None:
+                page_reviews = []
+                break
+            page_reviews = orjson.loads(response.content)
+            reviews.extend(page_reviews)
+        
+        # A full page stays unchanged once filled, so watch the next one for new reviews
+        self._review_pages[path] = page + 1 if len(page_reviews) == PER_PAGE else page
+        return reviews
+    
     def get_pr_comments(self, repo: str, pr_number: int) -> List[PREvent]:
         """Get comments on a specific PR since last check"""
         events = []
         
-        # Get issue comments using gh pr view
         try:
-            env = os.environ.copy()
-            env['GH_PAGER'] = ''
-            
-            # Get PR comments
-            result = subprocess.run(['gh', 'pr', 'view', str(pr_number), '--repo', repo, '--json', 'comments'], 
-                                  capture_output=True, text=True, check=True, env=env)
-            pr_data = json.loads(result.stdout)
-            
-            if 'comments' in pr_data:
-                for comment in pr_data['comments']:
-                    created_at = datetime.fromisoformat(comment['createdAt'].replace('Z', '+00:00'))
+            # Only comments updated since the last check; None means nothing changed since the last poll
+            response = self._get(f"/repos/{repo}/issues/{pr_number}/comments", {
+                'per_page': PER_PAGE,
+                'since': self._last_check_iso
+            })
+            if response is not None:
+                for comment in orjson.loads(response.content):
                     # In test mode, include own comments; in normal mode, exclude them
-                    author_filter = True if self.test_mode else comment['author']['login'] != self.username
-                    if created_at > self.last_check and author_filter:
-                        event_id = f"comment_{repo}_{pr_number}_{comment['id']}"
-                        if event_id not in self.processed_events:
+                    author_filter = True if self.test_mode else comment['user']['login'] != self.username
+                    # since matches edits too, so still require the comment itself to be new
+                    if comment['created_at'] > self._last_check_iso and author_filter:
+                        if self._mark_processed(comment['node_id']):
                             events.append(PREvent(
                                 pr_number=pr_number,
                                 event_type='comment',
-                                author=comment['author']['login'],
-                                created_at=comment['createdAt'],
-                                body=comment['body'][:100] + '...' if len(comment['body']) > 100 else comment['body']
+                                author=comment['user']['login'],
+                                created_at=comment['created_at'],
+                                body=comment['body']
                             ))
-                            self.processed_events.add(event_id)
-            
-            # Get PR reviews
-            result = subprocess.run(['gh', 'pr', 'view', str(pr_number), '--repo', repo, '--json', 'reviews'], 
-                                  capture_output=True, text=True, check=True, env=env)
-            pr_data = json.loads(result.stdout)
             
-            if 'reviews' in pr_data:
-                for review in pr_data['reviews']:
+            reviews = self._get_latest_reviews(repo, pr_number)
+            if reviews:
+                for review in reviews:
                     # Include all review types: APPROVED, CHANGES_REQUESTED, and COMMENTED
                     if review['state'] in ['APPROVED', 'CHANGES_REQUESTED', 'COMMENTED']:
-                        created_at = datetime.fromisoformat(review['submittedAt'].replace('Z', '+00:00'))
                         # In test mode, include own reviews; in normal mode, exclude them
-                        author_filter = True if self.test_mode else review['author']['login'] != self.username
-                        if created_at > self.last_check and author_filter:
-                            event_id = f"review_{repo}_{pr_number}_{review['id']}"
-                            if event_id not in self.processed_events:
+                        author_filter = True if self.test_mode else review['user']['login'] != self.username
+                        if review['submitted_at'] > self._last_check_iso and author_filter:
+                            if self._mark_processed(review['node_id']):
                                 if review['state'] == 'APPROVED':
                                     event_type = 'approved'
                                 elif review['state'] == 'CHANGES_REQUESTED':
@@ -182,13 +440,12 @@ class GitHubPRMonitor:
                                 events.append(PREvent(
                                     pr_number=pr_number,
                                     event_type=event_type,
-                                    author=review['author']['login'],
-                                    created_at=review['submittedAt'],
+                                    author=review['user']['login'],
+                                    created_at=review['submitted_at'],
                                     body=review.get('body', '')
                                 ))
-                                self.processed_events.add(event_id)
                                 
-        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError) as e:
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
             logger.error(f"Failed to get PR {pr_number} data from {repo}: {e}")
         
         return events
@@ -199,56 +456,103 @@ class GitHubPRMonitor:
             logger.warning("blink(1) not available, skipping flash")
             return
         
+        if event.event_type not in self._PATTERNS:
+            return
+        color, description, pattern = self._PATTERNS[event.event_type]
+        
         try:
-            if event.event_type == 'comment':
-                # Blue flash for comments
-                logger.info(f"Flashing BLUE for comment from {event.author}")
-                self.blink1.play_pattern('3, #0000FF,0.3,0, #000000,0.3,0')
-                
-            elif event.event_type == 'approved':
-                # Green flash for approvals
-                logger.info(f"Flashing GREEN for approval from {event.author}")
-                self.blink1.play_pattern('5, #00FF00,0.5,0, #000000,0.2,0')
-                
-            elif event.event_type == 'changes_requested':
-                # Red flash for change requests
-                logger.info(f"Flashing RED for change request from {event.author}")
-                self.blink1.play_pattern('2, #FF0000,1.0,0, #000000,0.5,0')
-                
-            elif event.event_type == 'commented':
-                # Yellow flash for review comments
-                logger.info(f"Flashing YELLOW for review comment from {event.author}")
-                self.blink1.play_pattern('3, #FFFF00,0.3,0, #000000,0.3,0')
-                
+            logger.info(f"Flashing {color} for {description} from {event.author}")
+            self.blink1.play_pattern(pattern)
         except Exception as e:
             logger.error(f"Failed to flash blink(1): {e}")
     
-    def check_for_updates(self):
-        """Check for new PR events and trigger notifications"""
+    def _flash_worker(self):
+        """Flash queued events one after another"""
+        while True:
+            event = self._flash_queue.get()
+            if event is None:
+                break
+            self.flash_for_event(event)
+            time.sleep(2)  # Small delay between flashes
+    
+    def _stop_flash_worker(self):
+        """Drop pending flashes and wait for the worker to finish with the device"""
+        while True:
+            try:
+                self._flash_queue.get_nowait()
+            except queue.Empty:
+                break
+        self._flash_queue.put(None)
+        self._flash_thread.join(timeout=10)
+    
+    def check_for_updates(self) -> int:
+        """Check for new PR events and trigger notifications, returning the number of new events"""
         logger.info("Checking for PR updates...")
         
-        prs = self.get_user_prs()
-        logger.info(f"Monitoring {len(prs)} open PRs")
+        # Taken before any request, so activity during this check is picked up by the next one
+        poll_started = datetime.now(timezone.utc)
+        
+        # GitHub timestamps use this fixed format, so they compare correctly as strings
+        self._last_check_iso = (self.last_check - POLL_OVERLAP).strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        # Own comments don't generate notifications, so test mode checks every PR
+        notified_prs = None if self.test_mode else self.get_notified_prs()
+        
+        if notified_prs is not None and not notified_prs:
+            prs = []
+            logger.info("No new notifications")
+        else:
+            cached = self._pr_cache
+            prs = self.get_user_prs()
+            if notified_prs is not None:
+                own_prs = {(pr['repository'], pr['number']) for pr in prs}
+                # A PR opened after the cached search isn't in it yet, so search again
+                if cached is not None and self._pr_cache is cached and notified_prs - own_prs - self._foreign_prs:
+                    self._pr_cache = None
+                    prs = self.get_user_prs()
+                    own_prs = {(pr['repository'], pr['number']) for pr in prs}
+                # Anything a fresh search doesn't list belongs to someone else; don't search again for it
+                if self._pr_cache is not None and self._pr_cache is not cached:
+                    self._foreign_prs |= notified_prs - own_prs
+            logger.info(f"Monitoring {len(prs)} open PRs")
+            if notified_prs is not None:
+                prs = [pr for pr in prs if (pr['repository'], pr['number']) in notified_prs]
+                logger.info(f"{len(prs)} PRs have new notifications")
         
         new_events = []
-        for pr in prs:
-            repo = pr['repository']
-            pr_number = pr['number']
-            
-            events = self.get_pr_comments(repo, pr_number)
-            new_events.extend(events)
+        # Fetch PRs concurrently; bounded to stay under GitHub's secondary rate limit
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(self.get_pr_comments, pr['repository'], pr['number'])
+                       for pr in prs]
+            for future in as_completed(futures):
+                new_events.extend(future.result())
         
         # Process new events
         for event in new_events:
             logger.info(f"New {event.event_type} on PR #{event.pr_number} by {event.author}")
             if event.body:
-                logger.info(f"Content: {event.body}")
+                # Truncate only for logging; events keep a reference to the original body
+                body = event.body
+                logger.info(f"Content: {body[:100] + '...' if len(body) > 100 else body}")
             
-            self.flash_for_event(event)
-            time.sleep(2)  # Small delay between flashes
+            self._flash_queue.put(event)
         
-        self.last_check = datetime.now(timezone.utc)
+        self.last_check = poll_started
+        self._save_state()
         logger.info(f"Check completed. Found {len(new_events)} new events")
+        return len(new_events)
+    
+    def _next_poll_interval(self, new_event_count: int) -> int:
+        """Get the delay before the next poll, backing off exponentially while idle"""
+        if new_event_count:
+            self._idle_ticks = 0
+            interval = self.poll_interval
+        else:
+            interval = min(self.poll_interval * 2 ** self._idle_ticks, MAX_POLL_INTERVAL)
+            self._idle_ticks = min(self._idle_ticks + 1, 5)
+        
+        # Never poll faster than configured or than GitHub asks
+        return max(interval, self.poll_interval, self._server_poll_interval)
     
     def run(self):
         """Main monitoring loop"""
@@ -257,16 +561,17 @@ class GitHubPRMonitor:
         
         while True:
             try:
-                self.check_for_updates()
-                time.sleep(self.poll_interval)
+                new_event_count = self.check_for_updates()
+                time.sleep(self._next_poll_interval(new_event_count))
             except KeyboardInterrupt:
                 logger.info("Stopping monitor...")
                 break
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
-                time.sleep(self.poll_interval)
+                time.sleep(max(self.poll_interval, self._server_poll_interval))
         
-        # Cleanup
+        # Cleanup; the worker must be done with the device before it is closed
+        self._stop_flash_worker()
         if self.blink1:
             self.blink1.off()
             self.blink1.close()
@@ -281,22 +586,9 @@ def main():
     
     args = parser.parse_args()
     
-    # Get username
+    # Get username; if unset, the monitor looks up the user the gh CLI token belongs to
     username = args.username or os.getenv('GITHUB_USERNAME')
     
-    if not username:
-        # Try to get username from gh CLI
-        try:
-            env = os.environ.copy()
-            env['GH_PAGER'] = ''
-            result = subprocess.run(['gh', 'api', 'user', '--jq', '.login'], 
-                                  capture_output=True, text=True, check=True, env=env)
-            username = result.stdout.strip()
-            logger.info(f"Using GitHub username from gh CLI: {username}")
-        except subprocess.CalledProcessError:
-            print("GitHub username required. Set GITHUB_USERNAME env var, use --username, or ensure gh CLI is authenticated")
-            exit(1)
-    
     if args.test:
         # Test blink(1) connection
         try:
@@ -319,7 +611,12 @@ def main():
     # Start monitoring
     if args.test_mode:
         logger.info("TEST MODE: Will flash for your own comments/reviews")
-    monitor = GitHubPRMonitor(username, args.interval, test_mode=args.test_mode)
+    try:
+        monitor = GitHubPRMonitor(username, args.interval, test_mode=args.test_mode)
+    except Exception as e:
+        # Setup failures (gh CLI missing, not authenticated, username lookup) are already logged
+        print(e)
+        exit(1)
     monitor.run()
 
 
@@ -16,7 +16,7 @@ if command -v uv &> /dev/null; then
 else
     echo "⚠️  uv not found. You can:"
     echo "   1. Install uv: curl -LsSf https://astral.sh/uv/install.sh | sh"
-    echo "   2. Or manually install: pip3 install requests>=2.32.5 blink1>=0.4.0"
+    echo "   2. Or manually install: pip3 install requests>=2.32.5 blink1>=0.4.0 orjson>=3.10"
     echo "   3. The script uses PEP 723 inline metadata for dependencies"
 fi
 